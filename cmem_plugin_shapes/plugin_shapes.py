@@ -1,20 +1,25 @@
 """Generate SHACL node and property shapes from a data graph"""
 
-import json
+import os
 import re
+import stat
 from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from functools import cache, lru_cache
 from http import HTTPStatus
-from io import BytesIO
 from pathlib import Path
-from urllib.parse import quote_plus
-from urllib.request import urlopen
+from tempfile import NamedTemporaryFile, TemporaryDirectory, gettempdir
+from typing import NamedTuple, TextIO
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
 from uuid import NAMESPACE_URL, uuid5
 
-from cmem.cmempy.api import send_request
-from cmem.cmempy.config import get_dp_api_endpoint
+import orjson
 from cmem.cmempy.dp.proxy.graph import get_graphs_list, post_streamed
 from cmem.cmempy.dp.proxy.sparql import post as post_sparql
 from cmem.cmempy.dp.proxy.update import post as post_update
+from cmem.cmempy.dp.titles import resolve
 from cmem.cmempy.workspace.projects.project import get_prefixes
 from cmem_plugin_base.dataintegration.context import ExecutionContext, ExecutionReport
 from cmem_plugin_base.dataintegration.description import Icon, Plugin, PluginParameter
@@ -25,7 +30,7 @@ from cmem_plugin_base.dataintegration.plugins import WorkflowPlugin
 from cmem_plugin_base.dataintegration.ports import FixedNumberOfInputs
 from cmem_plugin_base.dataintegration.types import BoolParameterType
 from cmem_plugin_base.dataintegration.utils import setup_cmempy_user_access
-from rdflib import RDF, RDFS, SH, XSD, Graph, Literal, Namespace, URIRef
+from rdflib import RDF, RDFS, SH, XSD, Namespace
 from rdflib.namespace import split_uri
 from validators import url
 
@@ -35,8 +40,81 @@ from . import __path__
 
 SHUI = Namespace("https://vocab.eccenca.com/shui/")
 PREFIX_CC = "https://prefix.cc/popular/all.file.json"
-TRUE_SET = {"yes", "true", "t", "y", "1"}
-FALSE_SET = {"no", "false", "f", "n", "0"}
+# the temporary directory is shared between users on POSIX systems, so add the uid
+# (private_cache_dir refuses directories owned or writable by someone else)
+PREFIX_CC_CACHE_DIR = Path(gettempdir()) / (
+    f"cmem-plugin-shapes-{os.getuid()}" if hasattr(os, "getuid") else "cmem-plugin-shapes"
+)
+TITLES_BATCH_SIZE = 500
+TITLES_MAX_WORKERS = 4
+TRUE_LITERAL = f'"true"^^<{XSD.boolean}>'
+TRUE_VALUES = frozenset(("true", "1"))
+NT_INVALID_IRI = re.compile(r'[\x00-\x20<>"{}|^`\\]')
+NT_ESCAPE = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r", "\t": "\\t"})
+RDF_TYPE = f"<{RDF.type}>"
+RDFS_LABEL = f"<{RDFS.label}>"
+SH_NODE_SHAPE = f"<{SH.NodeShape}>"
+SH_PROPERTY_SHAPE = f"<{SH.PropertyShape}>"
+SH_TARGET_CLASS = f"<{SH.targetClass}>"
+SH_NAME = f"<{SH.name}>"
+SH_PATH = f"<{SH.path}>"
+SH_NODE_KIND = f"<{SH.nodeKind}>"
+SH_PROPERTY = f"<{SH.property}>"
+SH_LITERAL = f"<{SH.Literal}>"
+SH_IRI = f"<{SH.IRI}>"
+SHUI_SHOW_ALWAYS = f"<{SHUI.showAlways}>"
+SHUI_INVERSE_PATH = f"<{SHUI.inversePath}>"
+SHUI_SHAPE_CATALOG = f"<{SHUI.ShapeCatalog}>"
+NODE_SHAPE_TEMPLATE = (
+    f"{{shape}} {RDF_TYPE} {SH_NODE_SHAPE} .\n"
+    f"{{shape}} {SH_TARGET_CLASS} {{target_class}} .\n"
+    f"{{shape}} {SH_NAME} {{name}} .\n"
+    f"{{shape}} {RDFS_LABEL} {{name}} .\n"
+)
+PROPERTY_SHAPE_TEMPLATE = (
+    f"{{shape}} {RDF_TYPE} {SH_PROPERTY_SHAPE} .\n"
+    f"{{shape}} {SH_PATH} {{path}} .\n"
+    f"{{shape}} {SH_NODE_KIND} {{node_kind}} .\n"
+    f"{{shape}} {SHUI_SHOW_ALWAYS} {TRUE_LITERAL} .\n"
+    f"{{shape}} {SH_NAME} {{name}} .\n"
+    f"{{shape}} {RDFS_LABEL} {{name}} .\n"
+)
+INVERSE_PATH_TEMPLATE = f"{{shape}} {SHUI_INVERSE_PATH} {TRUE_LITERAL} .\n"
+CLASS_QUERY_TEMPLATE = """
+PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+SELECT ?class ?property ?inverse (MAX(?literal) AS ?data)
+FROM <{data_graph}> {{
+    ?subject ?property ?object .
+    {ignore_filter}
+    {{
+        ?subject a ?class .
+        BIND(false AS ?inverse)
+    }}
+UNION
+    {{
+        ?object a ?class .
+        BIND(true AS ?inverse)
+    }}
+    BIND(IF(!?inverse, isLiteral(?object), false) AS ?literal)
+}}
+GROUP BY ?class ?property ?inverse
+"""
+IMPORT_QUERY_TEMPLATE = """
+INSERT DATA {{
+    GRAPH <https://vocab.eccenca.com/shacl/> {{
+        <https://vocab.eccenca.com/shacl/> <http://www.w3.org/2002/07/owl#imports>
+            <{shapes_graph}> .
+    }}
+}}
+"""
+
+
+class ClassProperty(NamedTuple):
+    """Property used with instances of a class"""
+
+    iri: str
+    data: bool
+    inverse: bool
 
 
 def format_namespace(iri: str) -> str:
@@ -44,15 +122,111 @@ def format_namespace(iri: str) -> str:
     return iri if iri.endswith(("/", "#")) else iri + "/"
 
 
-def str2bool(value: str) -> bool:
-    """Convert string to boolean"""
-    value = value.lower()
-    if value in TRUE_SET:
-        return True
-    if value in FALSE_SET:
+def iri_term(iri: str) -> str:
+    """Format IRI as N-Triples term"""
+    if NT_INVALID_IRI.search(iri):
+        raise ValueError(f"Invalid IRI ({iri}).")
+    return f"<{iri}>"
+
+
+def literal_term(value: str, lang: str | None = None) -> str:
+    """Format (language tagged) string literal as N-Triples term"""
+    escaped = value.translate(NT_ESCAPE)
+    return f'"{escaped}"@{lang}' if lang else f'"{escaped}"'
+
+
+def triple(subject: str, predicate: str, object_: str) -> str:
+    """Format N-Triples statement"""
+    return f"{subject} {predicate} {object_} .\n"
+
+
+def shape_uuid(iri: str, inverse: bool = False) -> str:
+    """Create the UUID of a node or property shape"""
+    return str(uuid5(NAMESPACE_URL, f"{iri}inverse" if inverse else iri))
+
+
+@lru_cache(maxsize=8192)
+def iri_namespace(iri: str) -> str:
+    """Get the namespace of a class or property IRI"""
+    try:
+        namespace, _ = split_uri(iri)
+    except ValueError as exc:
+        raise ValueError(f"Invalid class or property ({iri}).") from exc
+    return str(namespace)
+
+
+def private_cache_dir(cache_dir: Path) -> bool:
+    """Create the cache directory and check that no other user can write to it"""
+    with suppress(OSError):
+        cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+    try:
+        status = cache_dir.lstat()
+    except OSError:
+        return False
+    if not stat.S_ISDIR(status.st_mode):
         return False
-    allowed_values = '", "'.join(TRUE_SET | FALSE_SET)
-    raise ValueError(f'Expected one of: "{allowed_values}"')
+    if hasattr(os, "getuid"):
+        return status.st_uid == os.getuid() and not status.st_mode & 0o077
+    return True
+
+
+def read_prefix_cc_cache(cache_file: Path) -> dict | None:
+    """Read the cached prefix.cc download, None if missing or malformed"""
+    cached = None
+    with suppress(OSError, orjson.JSONDecodeError):
+        cached = orjson.loads(cache_file.read_bytes())
+    if not isinstance(cached, dict) or not isinstance(cached.get("prefixes"), dict):
+        return None
+    return cached
+
+
+def write_prefix_cc_cache(cache_file: Path, data: bytes) -> None:
+    """Write the prefix.cc cache via a temporary file, so no run reads a partial cache"""
+    try:
+        with NamedTemporaryFile(dir=cache_file.parent, delete=False) as temp_file:
+            temp_path = Path(temp_file.name)
+    except OSError:
+        return
+    try:
+        temp_path.write_bytes(data)
+        temp_path.replace(cache_file)
+    except OSError:
+        with suppress(OSError):
+            temp_path.unlink()
+
+
+def fetch_prefix_cc(cache_dir: Path = PREFIX_CC_CACHE_DIR) -> dict:
+    """Download prefixes from prefix.cc, revalidating a cached copy with ETag/Last-Modified"""
+    use_cache = private_cache_dir(cache_dir)
+    cache_file = cache_dir / "prefix_cc.json"
+    cached = read_prefix_cc_cache(cache_file) if use_cache else None
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    try:
+        with urlopen(Request(PREFIX_CC, headers=headers), timeout=30) as response:  # noqa: S310
+            prefixes = dict(orjson.loads(response.read()))
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+    except HTTPError as error:
+        if error.code != HTTPStatus.NOT_MODIFIED or not cached:
+            raise
+        return dict(cached["prefixes"])
+    if use_cache:
+        write_prefix_cc_cache(
+            cache_file,
+            orjson.dumps({"etag": etag, "last_modified": last_modified, "prefixes": prefixes}),
+        )
+    return prefixes
+
+
+@cache
+def load_local_prefixes() -> dict:
+    """Load the prefix.cc prefixes shipped with the plugin"""
+    return dict(orjson.loads((Path(__path__[0]) / "prefix_cc.json").read_bytes()))
 
 
 @Plugin(
@@ -130,6 +304,7 @@ class ShapesPlugin(WorkflowPlugin):
             if not url(_):
                 raise ValueError(f"Ignored property IRI invalid: '{_}'")
             self.ignore_properties.append(_)
+        self.ignore_filter = self.iri_list_to_filter(self.ignore_properties)
         self.overwrite = overwrite
         self.import_shapes = import_shapes
         self.prefix_cc = prefix_cc
@@ -142,44 +317,41 @@ class ShapesPlugin(WorkflowPlugin):
         if formatted_prefixes is None:
             formatted_prefixes = {}
         for prefix, namespace in prefixes.items():
-            formatted_prefixes.setdefault(namespace, []).append(prefix + ":")
+            formatted_prefixes.setdefault(namespace, set()).add(prefix + ":")
         return formatted_prefixes
 
-    def get_prefixes(self) -> dict:
-        """Fetch namespace prefixes"""
-        prefixes_project = get_prefixes(self.context.task.project_id())
-        prefixes = self.format_prefixes(prefixes_project)
-
-        prefixes_cc = None
-        if self.prefix_cc:
-            try:
-                res = urlopen(PREFIX_CC)  # noqa: S310
-                self.log.info("prefixes fetched from https://prefix.cc")
-                prefixes_cc = self.format_prefixes(json.loads(res.read()), prefixes)
-            except Exception as exc:  # noqa: BLE001
-                self.log.warning(
-                    f"failed to fetch prefixes from https://prefix.cc ({exc}) - using local file"
-                )
-        if not prefixes_cc or not self.prefix_cc:
-            with (Path(__path__[0]) / "prefix_cc.json").open("r", encoding="utf-8") as json_file:
-                prefixes_cc = self.format_prefixes(json.load(json_file), prefixes)
+    def get_prefixes(self, project_id: str) -> tuple[dict, dict | None, Exception | None]:
+        """Fetch project and prefix.cc prefixes (I/O only, runs in a worker thread)"""
+        project_prefixes = get_prefixes(project_id)
+        if not self.prefix_cc:
+            return project_prefixes, None, None
+        try:
+            return project_prefixes, fetch_prefix_cc(), None
+        except Exception as exc:  # noqa: BLE001
+            return project_prefixes, None, exc
+
+    def merge_prefixes(
+        self, project_prefixes: dict, prefixes_cc: dict | None, error: Exception | None
+    ) -> dict:
+        """Merge project and prefix.cc prefixes into a namespace dictionary"""
+        prefixes = self.format_prefixes(project_prefixes)
+        if prefixes_cc:
+            self.log.info("prefixes fetched from https://prefix.cc")
+        elif error:
+            self.log.warning(
+                f"failed to fetch prefixes from https://prefix.cc ({error}) - using local file"
+            )
+        self.format_prefixes(prefixes_cc or load_local_prefixes(), prefixes)
 
-        return {k: tuple(sorted(set(v))) for k, v in prefixes.items()}
+        return {k: tuple(sorted(v)) for k, v in prefixes.items()}
 
     def get_name(self, iri: str) -> str:
         """Generate shape name from IRI"""
-        response = send_request(
-            uri=f"{self.dp_api_endpoint}/api/explore/title?resource={quote_plus(iri)}",
-            method="GET",
-            headers={"Content-Type": "application/json", "Accept": "application/json"},
-        )
-        title_json = json.loads(response)
+        if iri in self.name_cache:
+            return self.name_cache[iri]
+        title_json = self.titles[iri]
         title: str = title_json["title"]
-        try:
-            namespace, _ = split_uri(iri)
-        except ValueError as exc:
-            raise ValueError(f"Invalid class or property ({iri}).") from exc
-
+        namespace = iri_namespace(iri)
         if namespace in self.prefixes:
             prefixes = self.prefixes[namespace]
             prefix = prefixes[0]
@@ -195,20 +367,36 @@ class ShapesPlugin(WorkflowPlugin):
                         raise IndexError(f"{title_json['title']} {prefixes}") from exc
             title += f" ({prefix})"
 
+        self.name_cache[iri] = title
         return title
 
-    def init_shapes_graph(self) -> Graph:
+    def fetch_titles(self, class_dict: dict[str, list[ClassProperty]]) -> None:
+        """Resolve the titles of all classes and properties in concurrent batches"""
+        iris = set(class_dict)
+        for properties in class_dict.values():
+            iris.update(prop.iri for prop in properties)
+        iri_list = list(iris)
+        batches = [
+            iri_list[i : i + TITLES_BATCH_SIZE] for i in range(0, len(iri_list), TITLES_BATCH_SIZE)
+        ]
+        self.titles = {}
+        with ThreadPoolExecutor(max_workers=TITLES_MAX_WORKERS) as executor:
+            for titles in executor.map(resolve, batches):
+                self.titles.update(titles)
+
+    def init_shapes_graph(self, shapes_graph: TextIO) -> None:
         """Initialize SHACL shapes graph"""
-        shapes_graph = Graph()
-        shapes_graph.add((URIRef(self.shapes_graph_iri), RDF.type, SHUI.ShapeCatalog))
-        shapes_graph.add(
+        shapes_graph_iri = iri_term(self.shapes_graph_iri)
+        shapes_graph.writelines(
             (
-                URIRef(self.shapes_graph_iri),
-                RDFS.label,
-                Literal(f"Shapes for {self.data_graph_iri}"),
+                triple(shapes_graph_iri, RDF_TYPE, SHUI_SHAPE_CATALOG),
+                triple(
+                    shapes_graph_iri,
+                    RDFS_LABEL,
+                    literal_term(f"Shapes for {self.data_graph_iri}"),
+                ),
             )
         )
-        return shapes_graph
 
     @staticmethod
     def iri_list_to_filter(iris: list[str], name: str = "property", filter_: str = "NOT IN") -> str:
@@ -222,111 +410,79 @@ class ShapesPlugin(WorkflowPlugin):
         iris_quoted = [f"<{_}>" for _ in iris]
         return f"FILTER (?{name} {filter_} ({', '.join(iris_quoted)}))"
 
-    def get_class_dict(self) -> dict:
+    def get_class_dict(self) -> dict[str, list[ClassProperty]]:
         """Retrieve classes and associated properties"""
         setup_cmempy_user_access(self.context.user)
-        query = f"""
-            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            SELECT DISTINCT ?class ?property ?data ?inverse
-            FROM <{self.data_graph_iri}> {{
-                {{
-                    ?subject a ?class .
-                    ?subject ?property ?object .
-                    {self.iri_list_to_filter(self.ignore_properties)}
-                    BIND(isLiteral(?object) AS ?data)
-                    BIND("false" AS ?inverse)
-                }}
-            UNION
-                {{
-                    ?object a ?class .
-                    ?subject ?property ?object .
-                    {self.iri_list_to_filter(self.ignore_properties)}
-                    BIND("false" AS ?data)
-                    BIND("true" AS ?inverse)
-                }}
-            }}
-        """  # noqa: S608
-        results = json.loads(post_sparql(query))
-
-        class_dict: dict = {}
+        query = CLASS_QUERY_TEMPLATE.format(
+            data_graph=self.data_graph_iri, ignore_filter=self.ignore_filter
+        )
+        results = orjson.loads(post_sparql(query))
+
+        class_dict: dict[str, list[ClassProperty]] = {}
         for binding in results["results"]["bindings"]:
-            class_iri = binding["class"]["value"]
-            if class_iri not in class_dict:
-                class_dict[class_iri] = []
-            class_dict[class_iri].append(
-                {
-                    "property": binding["property"]["value"],
-                    "data": str2bool(binding["data"]["value"]),
-                    "inverse": str2bool(binding["inverse"]["value"]),
-                }
+            class_dict.setdefault(binding["class"]["value"], []).append(
+                ClassProperty(
+                    binding["property"]["value"],
+                    binding["data"]["value"] in TRUE_VALUES,
+                    binding["inverse"]["value"] in TRUE_VALUES,
+                )
             )
         return class_dict
 
-    def create_shapes(self, shapes_graph: Graph) -> tuple[Graph, int]:
+    def node_shape_statements(self, node_shape_uri: str, cls: str) -> str:
+        """Create the statements of a SHACL node shape"""
+        return NODE_SHAPE_TEMPLATE.format(
+            shape=node_shape_uri,
+            target_class=iri_term(cls),
+            name=literal_term(self.get_name(cls), lang="en"),
+        )
+
+    def property_shape_statements(self, property_shape_uri: str, prop: ClassProperty) -> str:
+        """Create the statements of a SHACL property shape"""
+        name = self.get_name(prop.iri)
+        if prop.inverse:
+            name = "← " + name
+        statements = PROPERTY_SHAPE_TEMPLATE.format(
+            shape=property_shape_uri,
+            path=iri_term(prop.iri),
+            node_kind=SH_LITERAL if prop.data else SH_IRI,
+            name=literal_term(name, lang="en"),
+        )
+        if prop.inverse:
+            statements += INVERSE_PATH_TEMPLATE.format(shape=property_shape_uri)
+        return statements
+
+    def create_shapes(self, shapes_graph: TextIO) -> int:
         """Create SHACL node and property shapes"""
-        class_uuids = set()
-        prop_uuids = set()
-        shapes_count = 0
-        for cls, properties in self.get_class_dict().items():
-            class_uuid = uuid5(NAMESPACE_URL, cls)
-            node_shape_uri = URIRef(f"{format_namespace(self.shapes_graph_iri)}{class_uuid}")
-
-            if class_uuid not in class_uuids:
-                shapes_graph.add((node_shape_uri, RDF.type, SH.NodeShape))
-                shapes_graph.add((node_shape_uri, SH.targetClass, URIRef(cls)))
-                name = self.get_name(cls)
-                shapes_graph.add((node_shape_uri, SH.name, Literal(name, lang="en")))
-                shapes_graph.add((node_shape_uri, RDFS.label, Literal(name, lang="en")))
-                class_uuids.add(class_uuid)
+        property_shape_uris: dict[tuple[str, bool], str] = {}
+        namespace = format_namespace(self.shapes_graph_iri)
+        class_dict = self.get_class_dict()
+        if class_dict:
+            # the worker only does I/O, the execution context is used on this thread
+            project_id = self.context.task.project_id()
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                prefixes = executor.submit(self.get_prefixes, project_id)
+                self.fetch_titles(class_dict)
+                self.prefixes = self.merge_prefixes(*prefixes.result())
+        for cls, properties in class_dict.items():
+            node_shape_uri = iri_term(f"{namespace}{shape_uuid(cls)}")
+            shapes_graph.write(self.node_shape_statements(node_shape_uri, cls))
 
             for prop in properties:
-                prop_uuid = uuid5(
-                    NAMESPACE_URL, f'{prop["property"]}{"inverse" if prop["inverse"] else ""}'
-                )
-                property_shape_uri = URIRef(f"{format_namespace(self.shapes_graph_iri)}{prop_uuid}")
-
-                if prop_uuid not in prop_uuids:
-                    shapes_count += 1
-                    name = self.get_name(prop["property"])
-                    shapes_graph.add((property_shape_uri, RDF.type, SH.PropertyShape))
-                    shapes_graph.add((property_shape_uri, SH.path, URIRef(prop["property"])))
-                    shapes_graph.add(
-                        (property_shape_uri, SH.nodeKind, SH.Literal if prop["data"] else SH.IRI)
-                    )
-                    shapes_graph.add(
-                        (
-                            property_shape_uri,
-                            SHUI.showAlways,
-                            Literal("true", datatype=XSD.boolean),
-                        )
-                    )
-                    if prop["inverse"]:
-                        shapes_graph.add(
-                            (
-                                property_shape_uri,
-                                SHUI.inversePath,
-                                Literal("true", datatype=XSD.boolean),
-                            )
-                        )
-                        name = "← " + name
-                    shapes_graph.add((property_shape_uri, SH.name, Literal(name, lang="en")))
-                    shapes_graph.add((property_shape_uri, RDFS.label, Literal(name, lang="en")))
-                    prop_uuids.add(prop_uuid)
-
-                shapes_graph.add((node_shape_uri, SH.property, property_shape_uri))
-
-        return shapes_graph, shapes_count
+                key = (prop.iri, prop.inverse)
+                property_shape_uri = property_shape_uris.get(key)
+                if property_shape_uri is None:
+                    property_shape_uri = iri_term(f"{namespace}{shape_uuid(*key)}")
+                    property_shape_uris[key] = property_shape_uri
+                    shapes_graph.write(self.property_shape_statements(property_shape_uri, prop))
+
+                shapes_graph.write(triple(node_shape_uri, SH_PROPERTY, property_shape_uri))
+
+        return len(property_shape_uris)
 
     def import_shapes_graph(self) -> None:
         """Import SHACL shapes graph to catalog"""
-        query = f"""
-        INSERT DATA {{
-            GRAPH <https://vocab.eccenca.com/shacl/> {{
-                <https://vocab.eccenca.com/shacl/> <http://www.w3.org/2002/07/owl#imports>
-                    <{self.shapes_graph_iri}> .
-            }}
-        }}
-        """
+        query = IMPORT_QUERY_TEMPLATE.format(shapes_graph=self.shapes_graph_iri)
         setup_cmempy_user_access(self.context.user)
         post_update(query)
 
@@ -335,25 +491,25 @@ class ShapesPlugin(WorkflowPlugin):
         _ = inputs
         setup_cmempy_user_access(context.user)
 
-        if not self.overwrite and self.shapes_graph_iri in [
-            graph["iri"] for graph in get_graphs_list()
-        ]:
+        if not self.overwrite and any(
+            graph["iri"] == self.shapes_graph_iri for graph in get_graphs_list()
+        ):
             raise ValueError(f"Graph <{self.shapes_graph_iri}> already exists.")
 
         self.context = context
-        self.dp_api_endpoint = get_dp_api_endpoint()
-        self.prefixes = self.get_prefixes()
-
-        shapes_graph = self.init_shapes_graph()
-        shapes_graph, shapes_count = self.create_shapes(shapes_graph)
-
-        nt_file = BytesIO(shapes_graph.serialize(format="nt", encoding="utf-8"))
-        post_streamed(
-            self.shapes_graph_iri,
-            nt_file,
-            replace=self.overwrite,
-            content_type="application/n-triples",
-        )
+        self.name_cache: dict[str, str] = {}
+
+        with TemporaryDirectory() as temp_dir:
+            nt_file = Path(temp_dir) / "shapes.nt"
+            with nt_file.open("w", encoding="utf-8") as shapes_graph:
+                self.init_shapes_graph(shapes_graph)
+                shapes_count = self.create_shapes(shapes_graph)
+            post_streamed(
+                self.shapes_graph_iri,
+                str(nt_file),
+                replace=self.overwrite,
+                content_type="application/n-triples",
+            )
         self.context.report.update(
             ExecutionReport(
                 entity_count=shapes_count,
@@ -3,3 +3,5 @@
 from pathlib import Path
 
 FIXTURE_DIR = Path(__file__).parent / "fixture_dir"
+TEST_SHAPES_TTL = FIXTURE_DIR / "test_shapes.ttl"
+TEST_SHAPES_DATA_TTL = FIXTURE_DIR / "test_shapes_data.ttl"
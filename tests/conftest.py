@@ -0,0 +1,36 @@
+"""Shared test fixtures"""
+
+import os
+
+import pytest
+from rdflib import Graph
+
+from tests import TEST_SHAPES_TTL
+from tests.utils import canonical_hash
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Register custom markers"""
+    config.addinivalue_line("markers", "needs_cmem: test needs a configured CMEM instance")
+
+
+def pytest_collection_modifyitems(items: list[pytest.Item]) -> None:
+    """Skip tests marked with needs_cmem if no CMEM instance is configured"""
+    if os.environ.get("CMEM_BASE_URI", "") != "":
+        return
+    skip_cmem = pytest.mark.skip(reason="Needs CMEM configuration")
+    for item in items:
+        if item.get_closest_marker("needs_cmem"):
+            item.add_marker(skip_cmem)
+
+
+@pytest.fixture(scope="session")
+def expected_shapes_graph() -> Graph:
+    """Parse the expected shapes graph"""
+    return Graph().parse(TEST_SHAPES_TTL, format="turtle")
+
+
+@pytest.fixture(scope="session")
+def expected_shapes_hash(expected_shapes_graph: Graph) -> str:
+    """Canonical hash of the expected shapes graph"""
+    return canonical_hash(expected_shapes_graph)
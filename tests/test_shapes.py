@@ -1,24 +1,35 @@
 """Plugin tests."""
 
-import json
 import os
-from collections.abc import Generator
+from collections.abc import Callable, Generator
+from contextlib import suppress
 from dataclasses import dataclass
+from email.message import Message
+from http import HTTPStatus
+from io import BytesIO, StringIO
 from pathlib import Path
 from shutil import rmtree
 from tempfile import mkdtemp
-from typing import Any
+from types import SimpleNamespace
+from typing import Any, ClassVar
+from urllib.error import HTTPError
+from urllib.request import Request
 
+import orjson
 import pytest
-from cmem.cmempy.dp.proxy.graph import get
+from cmem.cmempy.dp.admin.backup import get_zip, post_zip
+from cmem.cmempy.dp.proxy.graph import delete as delete_graph
+from cmem.cmempy.dp.proxy.graph import get, get_graphs_list, post_streamed
 from cmem.cmempy.dp.proxy.sparql import get as ask
-from rdflib import Graph
-from rdflib.compare import isomorphic
+from cmem.cmempy.dp.proxy.update import post as post_update
+from cmem.cmempy.workspace.projects.project import delete_project, get_projects, make_new_project
+from rdflib import SH, XSD, Graph
+from requests import HTTPError as RequestsHTTPError
 
+from cmem_plugin_shapes import plugin_shapes
 from cmem_plugin_shapes.plugin_shapes import ShapesPlugin
-from tests import FIXTURE_DIR
-from tests.cmemc_command_utils import run, run_without_assertion
-from tests.utils import TestExecutionContext, needs_cmem
+from tests import FIXTURE_DIR, TEST_SHAPES_DATA_TTL, TEST_SHAPES_TTL
+from tests.utils import TestExecutionContext, assert_isomorphic, needs_cmem
 
 
 @dataclass
@@ -27,13 +38,20 @@ class GraphSetupFixture:
 
     project_name: str = "shapes_plugin_test"
     shapes_iri: str = "http://docker.localhost/my-persons-shapes"
-    shapes_file: str = str(FIXTURE_DIR / "test_shapes.ttl")
+    shapes_file: str = str(TEST_SHAPES_TTL)
     dataset_iri: str = "http://docker.localhost/my-persons"
-    dataset_file: str = str(FIXTURE_DIR / "test_shapes_data.ttl")
+    dataset_file: str = str(TEST_SHAPES_DATA_TTL)
     catalog_iri: str = "https://vocab.eccenca.com/shacl/"
     catalog_file: str = str(FIXTURE_DIR / "test_shapes_eccenca.ttl")
     ask_query: str = """PREFIX owl: <http://www.w3.org/2002/07/owl#>
 ASK
+{
+  GRAPH <https://vocab.eccenca.com/shacl/> {
+    <https://vocab.eccenca.com/shacl/> owl:imports <http://docker.localhost/my-persons-shapes>
+  }
+}"""
+    remove_import_query: str = """PREFIX owl: <http://www.w3.org/2002/07/owl#>
+DELETE DATA
 {
   GRAPH <https://vocab.eccenca.com/shacl/> {
     <https://vocab.eccenca.com/shacl/> owl:imports <http://docker.localhost/my-persons-shapes>
@@ -41,145 +59,378 @@ ASK
 }"""
 
 
-@pytest.fixture
-def graph_setup(tmp_path: Path) -> Generator[GraphSetupFixture, Any, None]:
-    """Graph setup fixture"""
-    if os.environ.get("CMEM_BASE_URI", "") == "":
-        pytest.skip("Needs CMEM configuration")
-    # make backup and delete all GRAPHS
+@pytest.fixture(scope="session")
+def _graph_setup_session(
+    tmp_path_factory: pytest.TempPathFactory,
+) -> Generator[GraphSetupFixture, Any, None]:
+    """Graph setup fixture, shared by all tests of a session"""
+    tmp_path = tmp_path_factory.mktemp("graph_setup")
     _ = GraphSetupFixture()
-    export_zip = str(tmp_path / "export.store.zip")
-    run(["admin", "store", "export", export_zip])
-    run(["graph", "import", _.dataset_file, _.dataset_iri])
-    run_without_assertion(["project", "delete", _.project_name])
-    run(["project", "create", _.project_name])
+    backups: dict[str, str] = {}
+    if os.environ.get("CMEM_TEST_STORE_BACKUP", "") != "":
+        # make backup of the complete store
+        export_zip = str(tmp_path / "export.store.zip")
+        with get_zip() as response, Path(export_zip).open("wb") as file:
+            for chunk in response.iter_content(chunk_size=None):
+                file.write(chunk)
+    else:
+        # make backup of the GRAPHS touched by the tests only
+        export_zip = ""
+        if any(project["name"] == _.project_name for project in get_projects()):
+            pytest.skip(
+                f"Project {_.project_name} exists and would be lost, "
+                "set CMEM_TEST_STORE_BACKUP to back up the complete store"
+            )
+        existing_graphs = {graph["iri"] for graph in get_graphs_list()}
+        for iri in (_.shapes_iri, _.dataset_iri, _.catalog_iri):
+            if iri in existing_graphs:
+                backups[iri] = str(tmp_path / f"{len(backups)}.nt")
+                Path(backups[iri]).write_bytes(get(iri).content)
+    post_streamed(
+        _.dataset_iri,
+        BytesIO(TEST_SHAPES_DATA_TTL.read_bytes()),
+        replace=True,
+        content_type="text/turtle",
+    )
+    if any(project["name"] == _.project_name for project in get_projects()):
+        # only reached with a store backup, which restores the project
+        delete_project(_.project_name)
+    make_new_project(_.project_name)
     yield _
-    # remove test GRAPHS
-    run(["admin", "store", "import", export_zip])
+    # restore backup
+    if export_zip:
+        post_zip(export_zip)
+        return
+    for iri in (_.shapes_iri, _.dataset_iri, _.catalog_iri):
+        if iri in backups:
+            post_streamed(iri, backups[iri], replace=True, content_type="application/n-triples")
+        else:
+            with suppress(RequestsHTTPError):
+                delete_graph(iri)
+    delete_project(_.project_name)
+
 
+@pytest.fixture
+def graph_setup(_graph_setup_session: GraphSetupFixture) -> Generator[GraphSetupFixture, Any, None]:
+    """Graph setup fixture, removing the generated shapes after each test"""
+    _ = _graph_setup_session
+    with suppress(RequestsHTTPError):
+        delete_graph(_.shapes_iri)
+    yield _
+    with suppress(RequestsHTTPError):
+        delete_graph(_.shapes_iri)
+    post_update(_.remove_import_query)
 
+
+@pytest.fixture(scope="session")
+def execution_context(_graph_setup_session: GraphSetupFixture) -> TestExecutionContext:
+    """Create the execution context of the test project once per session"""
+    return TestExecutionContext(project_id=_graph_setup_session.project_name)
+
+
+@pytest.fixture
+def run_plugin(
+    graph_setup: GraphSetupFixture, execution_context: TestExecutionContext
+) -> Callable[..., Graph]:
+    """Execute the plugin with test defaults and return the resulting shapes graph"""
+
+    def _run(**overrides: Any) -> Graph:  # noqa: ANN401
+        parameters: dict[str, Any] = {
+            "data_graph_iri": graph_setup.dataset_iri,
+            "shapes_graph_iri": graph_setup.shapes_iri,
+            "overwrite": True,
+            "import_shapes": False,
+            "prefix_cc": False,
+        } | overrides
+        ShapesPlugin(**parameters).execute(inputs=[], context=execution_context)
+        result_graph_nt = get(
+            graph_setup.shapes_iri, owl_imports_resolution=False, accept="application/n-triples"
+        ).text
+        return Graph().parse(data=result_graph_nt, format="nt")
+
+    return _run
+
+
+@needs_cmem
 def test_setup(graph_setup: GraphSetupFixture) -> None:
     """Test plugin execution"""
     _ = graph_setup
 
 
-def test_workflow_execution(graph_setup: GraphSetupFixture) -> None:
+@needs_cmem
+@pytest.mark.parametrize("prefix_cc", [False, True], ids=["local_prefixes", "prefix_cc"])
+def test_workflow_execution(
+    run_plugin: Callable[..., Graph],
+    expected_shapes_graph: Graph,
+    expected_shapes_hash: str,
+    prefix_cc: bool,
+) -> None:
     """Test plugin execution"""
-    plugin = ShapesPlugin(
-        data_graph_iri=graph_setup.dataset_iri,
-        shapes_graph_iri=graph_setup.shapes_iri,
-        overwrite=True,
-        import_shapes=False,
-        prefix_cc=False,
-    )
-    plugin.execute(inputs=[], context=TestExecutionContext(project_id=graph_setup.project_name))
-    result_graph_turtle = get(graph_setup.shapes_iri, owl_imports_resolution=False).text
-    result_graph = Graph().parse(data=result_graph_turtle)
-    test = Graph().parse(f"{FIXTURE_DIR}/test_shapes.ttl")
-    assert isomorphic(result_graph, test)
+    result_graph = run_plugin(prefix_cc=prefix_cc)
+    assert_isomorphic(result_graph, expected_shapes_graph, expected_shapes_hash)
     with pytest.raises(
         ValueError, match="Graph <http://docker.localhost/my-persons-shapes> already exists."
     ):
-        ShapesPlugin(
-            data_graph_iri=graph_setup.dataset_iri,
-            shapes_graph_iri=graph_setup.shapes_iri,
-            overwrite=False,
-            import_shapes=False,
-            prefix_cc=False,
-        ).execute(inputs=[], context=TestExecutionContext(project_id=graph_setup.project_name))
+        run_plugin(overwrite=False)
 
 
-def test_failing_inits(graph_setup: GraphSetupFixture) -> None:
-    """Test failing inits"""
-    with pytest.raises(ValueError, match="Data graph IRI parameter is invalid"):
-        ShapesPlugin(
-            data_graph_iri="no iri",
-            shapes_graph_iri=graph_setup.shapes_iri,
-            overwrite=False,
-            import_shapes=False,
-            prefix_cc=False,
-        )
-    with pytest.raises(ValueError, match="Shapes graph IRI parameter is invalid"):
-        ShapesPlugin(
-            data_graph_iri=graph_setup.dataset_iri,
-            shapes_graph_iri="no iri",
-            overwrite=False,
-            import_shapes=False,
-            prefix_cc=False,
-        )
-    with pytest.raises(ValueError, match="Ignored property IRI invalid"):
-        ShapesPlugin(
-            data_graph_iri=graph_setup.dataset_iri,
-            shapes_graph_iri=graph_setup.shapes_iri,
-            ignore_properties="""no iri""",
-        )
-    with pytest.raises(ValueError, match="Ignored property IRI invalid"):
-        ShapesPlugin(
-            data_graph_iri=graph_setup.dataset_iri,
-            shapes_graph_iri=graph_setup.shapes_iri,
-            ignore_properties="""http://www.w3.org/1999/02/22-rdf-syntax-ns#type
+@pytest.mark.parametrize(
+    ("kwargs", "match"),
+    [
+        (
+            {"data_graph_iri": "no iri", "shapes_graph_iri": GraphSetupFixture.shapes_iri},
+            "Data graph IRI parameter is invalid",
+        ),
+        (
+            {"data_graph_iri": GraphSetupFixture.dataset_iri, "shapes_graph_iri": "no iri"},
+            "Shapes graph IRI parameter is invalid",
+        ),
+        (
+            {
+                "data_graph_iri": GraphSetupFixture.dataset_iri,
+                "shapes_graph_iri": GraphSetupFixture.shapes_iri,
+                "ignore_properties": "no iri",
+            },
+            "Ignored property IRI invalid",
+        ),
+        (
+            {
+                "data_graph_iri": GraphSetupFixture.dataset_iri,
+                "shapes_graph_iri": GraphSetupFixture.shapes_iri,
+                "ignore_properties": """http://www.w3.org/1999/02/22-rdf-syntax-ns#type
             no iri""",
-        )
+            },
+            "Ignored property IRI invalid",
+        ),
+    ],
+)
+def test_failing_inits(kwargs: dict, match: str) -> None:
+    """Test failing inits"""
+    with pytest.raises(ValueError, match=match):
+        ShapesPlugin(**kwargs)
 
 
-def test_prefix_cc_fetching(graph_setup: GraphSetupFixture) -> None:
-    """Test prefix.cc fetching"""
+@needs_cmem
+def test_import_shapes(
+    graph_setup: GraphSetupFixture, execution_context: TestExecutionContext
+) -> None:
+    """Test plugin execution with import shapes"""
     plugin = ShapesPlugin(
         data_graph_iri=graph_setup.dataset_iri,
         shapes_graph_iri=graph_setup.shapes_iri,
         overwrite=True,
         import_shapes=False,
-        prefix_cc=True,
+        prefix_cc=False,
     )
-    plugin.execute(inputs=[], context=TestExecutionContext(project_id=graph_setup.project_name))
-    result_graph_turtle = get(graph_setup.shapes_iri, owl_imports_resolution=False).text
-    result_graph = Graph().parse(data=result_graph_turtle)
-    test = Graph().parse(f"{FIXTURE_DIR}/test_shapes.ttl")
-    assert isomorphic(result_graph, test)
+    plugin.execute(inputs=[], context=execution_context)
+    assert not orjson.loads(ask(query=graph_setup.ask_query)).get("boolean", True)
+    plugin.import_shapes = True
+    plugin.execute(inputs=[], context=execution_context)
+    assert orjson.loads(ask(query=graph_setup.ask_query)).get("boolean", False)
 
 
-def test_import_shapes(graph_setup: GraphSetupFixture) -> None:
-    """Test plugin execution with import shapes"""
-    ShapesPlugin(
-        data_graph_iri=graph_setup.dataset_iri,
-        shapes_graph_iri=graph_setup.shapes_iri,
-        overwrite=True,
-        import_shapes=False,
-        prefix_cc=False,
-    ).execute(inputs=[], context=TestExecutionContext(project_id=graph_setup.project_name))
-    assert not json.loads(ask(query=graph_setup.ask_query)).get("boolean", True)
-    ShapesPlugin(
-        data_graph_iri=graph_setup.dataset_iri,
-        shapes_graph_iri=graph_setup.shapes_iri,
-        overwrite=True,
-        import_shapes=True,
-        prefix_cc=False,
-    ).execute(inputs=[], context=TestExecutionContext(project_id=graph_setup.project_name))
-    assert json.loads(ask(query=graph_setup.ask_query)).get("boolean", False)
+RDF_TYPE = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+RDFS_LABEL = "http://www.w3.org/2000/01/rdf-schema#label"
 
 
-def test_filter_creation() -> None:
+@pytest.mark.parametrize(
+    ("iris", "kwargs", "expected"),
+    [
+        (
+            [RDF_TYPE, RDFS_LABEL],
+            {},
+            f"FILTER (?property NOT IN (<{RDF_TYPE}>, <{RDFS_LABEL}>))",
+        ),
+        ([RDFS_LABEL], {}, f"FILTER (?property NOT IN (<{RDFS_LABEL}>))"),
+        ([], {}, ""),
+        (
+            [RDF_TYPE, RDFS_LABEL],
+            {"filter_": "IN"},
+            f"FILTER (?property IN (<{RDF_TYPE}>, <{RDFS_LABEL}>))",
+        ),
+        (
+            [RDF_TYPE, RDFS_LABEL],
+            {"filter_": "IN", "name": "class"},
+            f"FILTER (?class IN (<{RDF_TYPE}>, <{RDFS_LABEL}>))",
+        ),
+    ],
+)
+def test_filter_creation(iris: list[str], kwargs: dict, expected: str) -> None:
     """Test FILTER NOT IN creation"""
-    rdf_type = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
-    rdfs_label = "http://www.w3.org/2000/01/rdf-schema#label"
-    assert (
-        ShapesPlugin.iri_list_to_filter(iris=[rdf_type, rdfs_label])
-        == f"FILTER (?property NOT IN (<{rdf_type}>, <{rdfs_label}>))"
+    assert ShapesPlugin.iri_list_to_filter(iris=iris, **kwargs) == expected
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "match"),
+    [
+        ({"name": "sfsdf sdf"}, "name must match"),
+        ({"filter_": "XXX"}, "filter_ must be"),
+    ],
+)
+def test_filter_creation_errors(kwargs: dict, match: str) -> None:
+    """Test FILTER creation with invalid arguments"""
+    with pytest.raises(ValueError, match=match):
+        ShapesPlugin.iri_list_to_filter(iris=[RDF_TYPE, RDFS_LABEL], **kwargs)
+
+
+class PrefixCCResponse(BytesIO):
+    """prefix.cc response"""
+
+    headers: ClassVar[dict] = {"ETag": '"v1"'}
+
+
+@pytest.fixture
+def prefix_cc_requests(monkeypatch: pytest.MonkeyPatch) -> list[dict]:
+    """Replace the prefix.cc download, recording the request headers"""
+    requests: list[dict] = []
+
+    def fake_urlopen(request: Request, timeout: int) -> BytesIO:
+        _ = timeout
+        requests.append(dict(request.header_items()))
+        if request.get_header("If-none-match") == '"v1"':
+            raise HTTPError(request.full_url, HTTPStatus.NOT_MODIFIED, "", Message(), None)
+        return PrefixCCResponse(b'{"foaf": "http://xmlns.com/foaf/0.1/"}')
+
+    monkeypatch.setattr(plugin_shapes, "urlopen", fake_urlopen)
+    return requests
+
+
+def test_prefix_cc_cache(tmp_path: Path, prefix_cc_requests: list[dict]) -> None:
+    """Test revalidation of the cached prefix.cc download"""
+    cache_dir = tmp_path / "cache"
+    expected = {"foaf": "http://xmlns.com/foaf/0.1/"}
+    assert plugin_shapes.fetch_prefix_cc(cache_dir) == expected
+    assert plugin_shapes.fetch_prefix_cc(cache_dir) == expected
+    assert "If-none-match" not in prefix_cc_requests[0]
+    assert prefix_cc_requests[1]["If-none-match"] == '"v1"'
+    assert [_.name for _ in cache_dir.iterdir()] == ["prefix_cc.json"]
+
+
+def test_prefix_cc_cache_malformed(tmp_path: Path, prefix_cc_requests: list[dict]) -> None:
+    """Test that a malformed cache is downloaded again and replaced"""
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir(mode=0o700)
+    (cache_dir / "prefix_cc.json").write_bytes(b'["v1"]')
+    expected = {"foaf": "http://xmlns.com/foaf/0.1/"}
+    assert plugin_shapes.fetch_prefix_cc(cache_dir) == expected
+    assert "If-none-match" not in prefix_cc_requests[0]
+    assert plugin_shapes.fetch_prefix_cc(cache_dir) == expected
+    assert prefix_cc_requests[1]["If-none-match"] == '"v1"'
+
+
+def test_prefix_cc_cache_write_error(
+    tmp_path: Path, prefix_cc_requests: list[dict], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a failing cache write leaves no temporary file behind"""
+
+    def fail_replace(self: Path, target: Path) -> None:
+        raise OSError(self, target)
+
+    monkeypatch.setattr(Path, "replace", fail_replace)
+    cache_dir = tmp_path / "cache"
+    assert plugin_shapes.fetch_prefix_cc(cache_dir) == {"foaf": "http://xmlns.com/foaf/0.1/"}
+    assert len(prefix_cc_requests) == 1
+    assert list(cache_dir.iterdir()) == []
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="Needs POSIX permissions")
+@pytest.mark.parametrize("unsafe", ["group_writable", "symlink"])
+def test_prefix_cc_cache_unsafe(
+    tmp_path: Path, prefix_cc_requests: list[dict], unsafe: str
+) -> None:
+    """Test that a cache directory others can write to is neither read nor written"""
+    target = tmp_path / "target"
+    target.mkdir()
+    target.chmod(0o770)
+    (target / "prefix_cc.json").write_bytes(
+        b'{"etag": "\\"v1\\"", "prefixes": {"foaf": "http://example.org/planted/"}}'
     )
-    assert (
-        ShapesPlugin.iri_list_to_filter(iris=[rdfs_label])
-        == f"FILTER (?property NOT IN (<{rdfs_label}>))"
+    cache_dir = target
+    if unsafe == "symlink":
+        target.chmod(0o700)
+        cache_dir = tmp_path / "cache"
+        cache_dir.symlink_to(target)
+    expected = {"foaf": "http://xmlns.com/foaf/0.1/"}
+    assert plugin_shapes.fetch_prefix_cc(cache_dir) == expected
+    assert plugin_shapes.fetch_prefix_cc(cache_dir) == expected
+    assert all("If-none-match" not in _ for _ in prefix_cc_requests)
+    assert [_.name for _ in target.iterdir()] == ["prefix_cc.json"]
+
+
+def test_n_triples_statements() -> None:
+    """Test parsing the generated N-Triples statements with rdflib"""
+    name = 'Straße "quoted" \\ back\nslash'
+    shape = plugin_shapes.iri_term("http://example.org/shape")
+    statements = plugin_shapes.NODE_SHAPE_TEMPLATE.format(
+        shape=shape,
+        target_class=plugin_shapes.iri_term("http://example.org/Class"),
+        name=plugin_shapes.literal_term(name, lang="en"),
+    ) + plugin_shapes.PROPERTY_SHAPE_TEMPLATE.format(
+        shape=shape,
+        path=plugin_shapes.iri_term("http://example.org/property"),
+        node_kind=plugin_shapes.SH_LITERAL,
+        name=plugin_shapes.literal_term(name),
     )
-    assert ShapesPlugin.iri_list_to_filter(iris=[]) == ""
-    assert (
-        ShapesPlugin.iri_list_to_filter(iris=[rdf_type, rdfs_label], filter_="IN")
-        == f"FILTER (?property IN (<{rdf_type}>, <{rdfs_label}>))"
+    graph = Graph().parse(data=statements, format="nt")
+    assert len(graph) == len(statements.splitlines())
+    assert {str(_) for _ in graph.objects(predicate=SH.name)} == {name}
+
+
+@pytest.mark.parametrize(
+    "iri", ["http://example.org/x>y", "http://example.org/x y", 'http://example.org/"x"']
+)
+def test_invalid_iri_term(iri: str) -> None:
+    """Test rejection of IRIs which can not be written as N-Triples"""
+    with pytest.raises(ValueError, match="Invalid IRI"):
+        plugin_shapes.iri_term(iri)
+
+
+def test_class_dict_boolean_forms(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test parsing both lexical forms of xsd:boolean in the class query result"""
+
+    def binding(cls: str, prop: str, data: str, inverse: str) -> dict:
+        return {
+            "class": {"type": "uri", "value": cls},
+            "property": {"type": "uri", "value": prop},
+            "data": {"type": "literal", "datatype": str(XSD.boolean), "value": data},
+            "inverse": {"type": "literal", "datatype": str(XSD.boolean), "value": inverse},
+        }
+
+    bindings = [
+        binding("http://e/C", "http://e/a", "true", "false"),
+        binding("http://e/C", "http://e/b", "1", "0"),
+        binding("http://e/C", "http://e/c", "false", "true"),
+        binding("http://e/C", "http://e/d", "0", "1"),
+    ]
+    response = orjson.dumps({"results": {"bindings": bindings}}).decode()
+    monkeypatch.setattr(plugin_shapes, "setup_cmempy_user_access", lambda _: None)
+    monkeypatch.setattr(plugin_shapes, "post_sparql", lambda _: response)
+    plugin = ShapesPlugin(
+        data_graph_iri=GraphSetupFixture.dataset_iri,
+        shapes_graph_iri=GraphSetupFixture.shapes_iri,
     )
-    assert (
-        ShapesPlugin.iri_list_to_filter(iris=[rdf_type, rdfs_label], filter_="IN", name="class")
-        == f"FILTER (?class IN (<{rdf_type}>, <{rdfs_label}>))"
+    monkeypatch.setattr(plugin, "context", SimpleNamespace(user=None), raising=False)
+    assert plugin.get_class_dict() == {
+        "http://e/C": [
+            plugin_shapes.ClassProperty("http://e/a", data=True, inverse=False),
+            plugin_shapes.ClassProperty("http://e/b", data=True, inverse=False),
+            plugin_shapes.ClassProperty("http://e/c", data=False, inverse=True),
+            plugin_shapes.ClassProperty("http://e/d", data=False, inverse=True),
+        ]
+    }
+
+
+def test_empty_data_graph_skips_prefixes(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that an empty data graph does not fetch prefixes or titles"""
+    plugin = ShapesPlugin(
+        data_graph_iri=GraphSetupFixture.dataset_iri,
+        shapes_graph_iri=GraphSetupFixture.shapes_iri,
     )
-    with pytest.raises(ValueError, match="name must match"):
-        ShapesPlugin.iri_list_to_filter(iris=[rdf_type, rdfs_label], name="sfsdf sdf")
-    with pytest.raises(ValueError, match="filter_ must be"):
-        ShapesPlugin.iri_list_to_filter(iris=[rdf_type, rdfs_label], filter_="XXX")
+
+    def fail() -> None:
+        pytest.fail("prefixes or titles requested for an empty data graph")
+
+    monkeypatch.setattr(plugin, "get_class_dict", dict)
+    monkeypatch.setattr(plugin, "get_prefixes", fail)
+    monkeypatch.setattr(plugin, "fetch_titles", lambda _: fail())
+    assert plugin.create_shapes(StringIO()) == 0
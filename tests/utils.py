@@ -3,7 +3,7 @@
 Remove this and other example files after bootstrapping your project.
 """
 
-import os
+from hashlib import sha256
 from typing import ClassVar
 
 import pytest
@@ -18,10 +18,10 @@ from cmem_plugin_base.dataintegration.context import (
     TaskContext,
     UserContext,
 )
+from rdflib import BNode, Graph
+from rdflib.compare import graph_diff, to_canonical_graph, to_isomorphic
 
-needs_cmem = pytest.mark.skipif(
-    os.environ.get("CMEM_BASE_URI", "") == "", reason="Needs CMEM configuration"
-)
+needs_cmem = pytest.mark.needs_cmem
 
 
 class TestUserContext(UserContext):
@@ -72,3 +72,22 @@ class TestExecutionContext(ExecutionContext):
         self.user = TestUserContext()
         self.report = ReportContext()
         self.task = TestTaskContext(project_id=project_id, task_id=task_id)
+
+
+def canonical_hash(graph: Graph) -> str:
+    """Hash the sorted N-Triples of the graph, canonicalizing blank nodes only if present"""
+    if any(isinstance(term, BNode) for triple in graph for term in triple):
+        graph = to_canonical_graph(graph)
+    lines = sorted(graph.serialize(format="nt").splitlines())
+    return sha256("\n".join(lines).encode()).hexdigest()
+
+
+def assert_isomorphic(result: Graph, expected: Graph, expected_hash: str) -> None:
+    """Compare graphs by canonical hash and only diff them on mismatch"""
+    if canonical_hash(result) == expected_hash:
+        return
+    _, only_result, only_expected = graph_diff(to_isomorphic(result), to_isomorphic(expected))
+    pytest.fail(
+        f"unexpected triples:\n{only_result.serialize(format='nt')}\n"
+        f"missing triples:\n{only_expected.serialize(format='nt')}"
+    )
@@ -1,11 +1,40 @@
 """Helper script to download prefixes in task custom:update_prefixes"""
 
-from json import dump, loads
+from contextlib import suppress
+from hashlib import sha256
+from http import HTTPStatus
 from pathlib import Path
-from urllib.request import urlopen
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
 
-with urlopen("http://prefix.cc/popular/all.file.json") as remote_file:
-    json_data = loads(remote_file.read())
+import orjson
 
-with (Path("cmem_plugin_shapes") / "prefix_cc.json").open("w") as local_file:
-    dump(json_data, local_file, sort_keys=True, indent=2)
+PREFIX_CC = "http://prefix.cc/popular/all.file.json"
+PREFIX_FILE = Path("cmem_plugin_shapes") / "prefix_cc.json"
+ETAG_FILE = Path("prefix_cc.etag")
+
+headers = {}
+if PREFIX_FILE.exists() and ETAG_FILE.exists():
+    # the ETag is only valid for the prefix file it was downloaded with
+    with suppress(orjson.JSONDecodeError, AttributeError, KeyError):
+        stored = orjson.loads(ETAG_FILE.read_bytes())
+        if stored.get("sha256") == sha256(PREFIX_FILE.read_bytes()).hexdigest():
+            headers["If-None-Match"] = stored["etag"]
+
+try:
+    with urlopen(Request(PREFIX_CC, headers=headers)) as remote_file:  # noqa: S310
+        json_data = orjson.loads(remote_file.read())
+        etag = remote_file.headers.get("ETag")
+except HTTPError as error:
+    # 304: prefix.cc did not change since the last download
+    if error.code != HTTPStatus.NOT_MODIFIED:
+        raise
+else:
+    prefix_data = orjson.dumps(json_data, option=orjson.OPT_SORT_KEYS | orjson.OPT_INDENT_2)
+    PREFIX_FILE.write_bytes(prefix_data)
+    if etag:
+        ETAG_FILE.write_bytes(
+            orjson.dumps({"etag": etag, "sha256": sha256(prefix_data).hexdigest()})
+        )
+    else:
+        ETAG_FILE.unlink(missing_ok=True)